@@ -17,8 +17,20 @@ def get_argparser():
                                         ' a project folder. Invoke '
                                         '"ut init" to start a new project.')
     parser.add_argument("--num_GPUs", type=int, default=1,
-                        help="Number of GPUs to use for this job (default=1)")
+                        help="Number of GPUs to use for this job (default=1)."
+                             " With more than 1 GPU the model is replicated "
+                             "on each GPU (tf.distribute.MirroredStrategy).")
     parser.add_argument("--force_GPU", type=str, default="")
+    parser.add_argument("--no_gpu_mon", action="store_true",
+                        help="Do not start a GPUMonitor process to select "
+                             "free GPUs. Uses the first --num_GPUs visible "
+                             "GPUs (or those set with --force_GPU) instead, "
+                             "whether or not they are in use.")
+    parser.add_argument("--grad_accum_steps", type=int, default=1,
+                        help="Accumulate gradients over this number of "
+                             "batches before each update. With multiple GPUs,"
+                             " gradients are synchronized only once per "
+                             "update (default=1)")
     parser.add_argument("--continue_training", action="store_true",
                         help="Continue the last training session")
     parser.add_argument("--initialize_from", type=str, default=None,
@@ -49,9 +61,34 @@ def get_argparser():
                              "specified in the parameter file.")
     parser.add_argument("--final_weights_file_name", type=str,
                         default="model_weights.h5")
+    parser.add_argument("--export_int8", action="store_true",
+                        help="After training, also save an int8 post-training"
+                             " quantized TFLite model (calibrated on "
+                             "validation data) for CPU inference. The model "
+                             "is rebuilt in float32 on a single device from "
+                             "the final weights before conversion.")
     parser.add_argument("--train_on_val", action="store_true",
                         help="Include the validation set in the training set."
                              " Will force --no_val to be active.")
+    parser.add_argument("--steps_per_execution", type=int, default=1,
+                        help="Number of training batches to run within a "
+                             "single call of the compiled train function. "
+                             "Values > 1 reduce per-batch launch and Python "
+                             "overhead for small batches (default=1)")
+    parser.add_argument("--amp", type=str, default="off",
+                        choices=("off", "fp16"),
+                        help="Train with the 'mixed_float16' precision policy;"
+                             " float16 compute with float32 variables and "
+                             "dynamic loss scaling (default=off)")
+    parser.add_argument("--deterministic", action="store_true",
+                        help="Use deterministic GPU ops and disable cuDNN "
+                             "autotuning. Note: batch sampling is not seeded,"
+                             " so runs are not fully reproducible. Slows "
+                             "training.")
+    parser.add_argument("--xla", action="store_true",
+                        help="Enable XLA auto-clustering, which compiles and "
+                             "fuses (e.g. conv-activation-batch norm) ops of "
+                             "the training graph.")
     return parser
 
 
@@ -65,6 +102,12 @@ def assert_args(args):
                          "val_samples_per_epoch must be >= 1.")
     if args.n_epochs is not None and args.n_epochs < 1:
         raise ValueError("n_epochs must be larger than >= 1.")
+    if args.grad_accum_steps < 1 or args.steps_per_execution < 1:
+        raise ValueError("grad_accum_steps and steps_per_execution must "
+                         "be >= 1.")
+    if args.grad_accum_steps > 1 and args.steps_per_execution > 1:
+        raise ValueError("Should not specify both --grad_accum_steps and "
+                         "--steps_per_execution")
 
 
 def update_hparams_with_command_line_arguments(hparams, args):
@@ -82,7 +125,6 @@ def update_hparams_with_command_line_arguments(hparams, args):
                           name="n_epochs",
                           value=args.n_epochs,
                           overwrite=True)
-        hparams["fit"]["n_epochs"] = args.n_epochs
     if args.channels is not None and args.channels:
         # Channel selection hyperparameter might be stored in separate conf.
         # files. Here, we load them, set the channel value, and save them again
@@ -92,7 +134,9 @@ def update_hparams_with_command_line_arguments(hparams, args):
                                       name="select_channels",
                                       value=args.channels,
                                       overwrite=True)
-            dataset_hparams.save_current()
+            if dataset_hparams is not hparams:
+                # 'hparams' itself is saved below
+                dataset_hparams.save_current()
     hparams.save_current()
 
 
@@ -103,18 +147,19 @@ def run(args, gpu_mon):
     args:
         args:    (Namespace)  command-line arguments
         gpu_mon: (GPUMonitor) Initialized MultiPlanarUNet GPUMonitor object
+                              or None if --no_gpu_mon is set
     """
-    assert_args(args)
     from mpunet.logging import Logger
     from utime.train import Trainer
     from utime.hyperparameters import YAMLHParams
     from utime.utils.scriptutils import (assert_project_folder,
-                                         make_multi_gpu_model)
+                                         get_distribution_strategy)
     from utime.utils.scriptutils.train import (get_train_and_val_datasets,
                                                get_generators,
                                                find_and_set_gpus,
                                                get_samples_per_epoch,
-                                               save_final_weights)
+                                               save_final_weights,
+                                               save_int8_model)
 
     project_dir = os.path.abspath("./")
     assert_project_folder(project_dir)
@@ -162,17 +207,42 @@ def run(args, gpu_mon):
 
     # Set the GPU visibility
     num_GPUs = find_and_set_gpus(gpu_mon, args.force_GPU, args.num_GPUs)
-    # Initialize and potential load parameters into the model
-    from utime.models.model_init import init_model, load_from_file
-    org_model = init_model(hparams["build"], logger)
-    if parameter_file:
-        load_from_file(org_model, parameter_file, logger, by_name=True)
-    model, org_model = make_multi_gpu_model(org_model, num_GPUs)
-
-    # Prepare a trainer object. Takes care of compiling and training.
-    trainer = Trainer(model, org_model=org_model, logger=logger)
-    trainer.compile_model(n_classes=hparams["build"].get("n_classes"),
-                          **hparams["fit"])
+    # TF autotunes cuDNN conv. algorithms by default; deterministic ops force
+    # a fixed choice instead
+    if args.deterministic:
+        os.environ["TF_DETERMINISTIC_OPS"] = "1"
+        os.environ["TF_CUDNN_USE_AUTOTUNE"] = "0"
+        logger("Deterministic GPU ops enabled")
+
+    if args.xla:
+        import tensorflow as tf
+        tf.config.optimizer.set_jit(True)
+        logger("XLA auto-clustering enabled")
+
+    if args.amp == "fp16":
+        # Must be set before the model is initialized. The optimizer is wrapped
+        # in a LossScaleOptimizer by tf.keras for the 'mixed_float16' policy
+        from tensorflow.keras.mixed_precision import experimental as mp
+        mp.set_policy("mixed_float16")
+        logger("Mixed precision policy: mixed_float16")
+
+    # Model variables and optimizer slots must be created within the scope
+    # of the distribution strategy
+    strategy = get_distribution_strategy(num_GPUs, logger)
+    with strategy.scope():
+        # Initialize and potential load parameters into the model
+        # Note: clearing the session would reset the graph holding the scope
+        from utime.models.model_init import init_model, load_from_file
+        model = init_model(hparams["build"], logger, clear_previous=False)
+        if parameter_file:
+            load_from_file(model, parameter_file, logger, by_name=True)
+
+        # Prepare a trainer object. Takes care of compiling and training.
+        trainer = Trainer(model, logger=logger)
+        trainer.compile_model(n_classes=hparams["build"].get("n_classes"),
+                              grad_accum_steps=args.grad_accum_steps,
+                              steps_per_execution=args.steps_per_execution,
+                              **hparams["fit"])
 
     # Fit the model on a number of samples as specified in args
     samples_pr_epoch = get_samples_per_epoch(train_seq,
@@ -191,21 +261,44 @@ def run(args, gpu_mon):
                        model=model,
                        file_name=args.final_weights_file_name,
                        logger=logger)
+    if args.export_int8:
+        # Quantize a float32, single-device copy of the final model, as the
+        # trained model may use a mixed precision policy and/or be mirrored
+        if args.amp != "off":
+            from tensorflow.keras.mixed_precision import experimental as mp
+            mp.set_policy("float32")
+        name = os.path.splitext(args.final_weights_file_name)[0]
+        export_model = init_model(hparams["build"], logger)
+        load_from_file(export_model,
+                       os.path.join(project_dir, "model", name + ".h5"),
+                       logger, by_name=True)
+        # Save model_dir/{final_weights_file_name}_int8.tflite
+        calibration_seqs = val_seq.sequences if val_seq else [train_seq]
+        save_int8_model(project_dir,
+                        model=export_model,
+                        calibration_seqs=calibration_seqs,
+                        file_name=name + "_int8",
+                        logger=logger)
 
 
 def entry_func(args=None):
     # Get the script to execute, parse only first input
     parser = get_argparser()
     args = parser.parse_args(args)
+    # Check args before importing and starting the (heavy) GPUMonitor process
+    assert_args(args)
 
     # Here, we wrap the training in a try/except block to ensure that we
     # stop the GPUMonitor process after training, even if an error occurred
-    from mpunet.utils.system import GPUMonitor
-    gpu_mon = GPUMonitor()
+    gpu_mon = None
+    if not args.no_gpu_mon:
+        from mpunet.utils.system import GPUMonitor
+        gpu_mon = GPUMonitor()
     try:
         run(args=args, gpu_mon=gpu_mon)
     except Exception as e:
-        gpu_mon.stop()
+        if gpu_mon is not None:
+            gpu_mon.stop()
         raise e
 
 
@@ -132,6 +132,7 @@ class DeepFeatureNet(tf.keras.Model):
         if self.classify:
             outputs = Concatenate(name="concat_features")([enc1, enc2])
             outputs = Dense(self.n_classes, activation="softmax",
+                            dtype="float32",
                             name="classifier")(outputs)
         else:
             outputs = Concatenate(name="concat")([enc1, enc2])
@@ -242,8 +243,10 @@ class DeepSleepNet(DeepFeatureNet):
         with tf.name_scope("classifier"):
             # Classify
             outputs = Dense(units=self.n_classes, activation="softmax",
+                            dtype="float32",
                             name="deep_sleep_net_classifier")(outputs)
             s = [-1, self.n_periods, self.n_classes]
             outputs = Lambda(self._reshape, arguments={"shape": s},
+                             dtype="float32",
                              name="output_reshape")(outputs)
         return [inputs], [outputs]
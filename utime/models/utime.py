@@ -13,10 +13,32 @@ from tensorflow.keras import regularizers
 from tensorflow.keras.layers import Input, BatchNormalization, Cropping2D, \
                                     Concatenate, MaxPooling2D, Dense, \
                                     UpSampling2D, ZeroPadding2D, Lambda, Conv2D, \
-                                    AveragePooling2D, DepthwiseConv2D
+                                    AveragePooling2D, DepthwiseConv2D, \
+                                    Cropping1D, MaxPooling1D, UpSampling1D, \
+                                    ZeroPadding1D, Conv1D, AveragePooling1D
 from mpunet.logging import ScreenLogger
 from mpunet.utils.conv_arithmetics import compute_receptive_fields
 
+# Layer types for 1D and 2D (with 'dummy' axis) operations, see 'conv_dim'
+LAYERS = {
+    1: {"conv": Conv1D, "max_pool": MaxPooling1D, "avg_pool": AveragePooling1D,
+        "up": UpSampling1D, "crop": Cropping1D, "pad": ZeroPadding1D},
+    2: {"conv": Conv2D, "max_pool": MaxPooling2D, "avg_pool": AveragePooling2D,
+        "up": UpSampling2D, "crop": Cropping2D, "pad": ZeroPadding2D}
+}
+
+
+def time_axis(value, conv_dim):
+    """
+    Returns a kernel/pool size or a (before, after) crop/padding pair 'value'
+    along the time axis in the format expected by 1D or 2D layers.
+    """
+    if conv_dim == 1:
+        return tuple(value) if isinstance(value, (list, tuple)) else value
+    if isinstance(value, (list, tuple)):
+        return [list(value), [0, 0]]
+    return value, 1
+
 
 class UTime(Model):
     """
@@ -24,6 +46,8 @@ class UTime(Model):
          of shape [bs, d, c] is processed as [bs, d, 1, c]. These operations
          are (on our systems, at least) currently significantly faster than
          their 1D counterparts in tf.keras.
+         Set conv_dim=1 to use 1D operations instead. Note that parameter
+         files are not compatible between the two.
 
     See also original U-net paper at http://arxiv.org/abs/1505.04597
     """
@@ -41,6 +65,7 @@ class UTime(Model):
                  l2_reg=None,
                  pools=(10, 8, 6, 4),
                  data_per_prediction=None,
+                 conv_dim=2,
                  logger=None,
                  build=True,
                  **kwargs):
@@ -76,6 +101,9 @@ class UTime(Model):
             TODO
         data_per_prediction (int):
             TODO
+        conv_dim (int):
+            Use 1D (conv_dim=1) or 2D operations with a 'dummy' axis
+            (conv_dim=2, default) internally.
         logger (MultiPlanarUNet.logging.Logger | ScreenLogger):
             MutliViewUNet.Logger object, logging to files or screen.
         build (bool):
@@ -109,6 +137,10 @@ class UTime(Model):
         self.padding = padding.lower()
         if self.padding != "same":
             raise ValueError("Currently, must use 'same' padding.")
+        self.conv_dim = int(conv_dim)
+        if self.conv_dim not in LAYERS:
+            raise ValueError("Argument 'conv_dim' must be 1 or 2, "
+                             "got {}".format(conv_dim))
 
         self.dense_classifier_activation = dense_classifier_activation
         self.data_per_prediction = data_per_prediction or self.input_dims
@@ -124,7 +156,8 @@ class UTime(Model):
             super().__init__(*self.init_model())
 
             # Compute receptive field
-            ind = [x.__class__.__name__ for x in self.layers].index("UpSampling2D")
+            up_name = LAYERS[self.conv_dim]["up"].__name__
+            ind = [x.__class__.__name__ for x in self.layers].index(up_name)
             self.receptive_field = compute_receptive_fields(self.layers[:ind])[-1][-1]
 
             # Log the model definition
@@ -142,26 +175,29 @@ class UTime(Model):
                        dilation,
                        padding,
                        kernel_reg=None,
+                       conv_dim=2,
                        name="encoder",
                        name_prefix=""):
         name = "{}{}".format(name_prefix, name)
+        layers = LAYERS[conv_dim]
+        kernel_size = time_axis(kernel_size, conv_dim)
         residual_connections = []
         for i in range(depth):
             l_name = name + "_L%i" % i
-            conv = Conv2D(filters, (kernel_size, 1),
-                          activation=activation, padding=padding,
-                          kernel_regularizer=kernel_reg,
-                          dilation_rate=dilation,
-                          name=l_name + "_conv1")(in_)
+            conv = layers["conv"](filters, kernel_size,
+                                  activation=activation, padding=padding,
+                                  kernel_regularizer=kernel_reg,
+                                  dilation_rate=dilation,
+                                  name=l_name + "_conv1")(in_)
             bn = BatchNormalization(name=l_name + "_BN1")(conv)
-            conv = Conv2D(filters, (kernel_size, 1),
-                          activation=activation, padding=padding,
-                          kernel_regularizer=kernel_reg,
-                          dilation_rate=dilation,
-                          name=l_name + "_conv2")(bn)
+            conv = layers["conv"](filters, kernel_size,
+                                  activation=activation, padding=padding,
+                                  kernel_regularizer=kernel_reg,
+                                  dilation_rate=dilation,
+                                  name=l_name + "_conv2")(bn)
             bn = BatchNormalization(name=l_name + "_BN2")(conv)
-            in_ = MaxPooling2D(pool_size=(pools[i], 1),
-                               name=l_name + "_pool")(bn)
+            in_ = layers["max_pool"](pool_size=time_axis(pools[i], conv_dim),
+                                     name=l_name + "_pool")(bn)
 
             # add bn layer to list for residual conn.
             residual_connections.append(bn)
@@ -169,17 +205,17 @@ class UTime(Model):
 
         # Bottom
         name = "{}bottom".format(name_prefix)
-        conv = Conv2D(filters, (kernel_size, 1),
-                      activation=activation, padding=padding,
-                      kernel_regularizer=kernel_reg,
-                      dilation_rate=1,
-                      name=name + "_conv1")(in_)
+        conv = layers["conv"](filters, kernel_size,
+                              activation=activation, padding=padding,
+                              kernel_regularizer=kernel_reg,
+                              dilation_rate=1,
+                              name=name + "_conv1")(in_)
         bn = BatchNormalization(name=name + "_BN1")(conv)
-        conv = Conv2D(filters, (kernel_size, 1),
-                      activation=activation, padding=padding,
-                      kernel_regularizer=kernel_reg,
-                      dilation_rate=1,
-                      name=name + "_conv2")(bn)
+        conv = layers["conv"](filters, kernel_size,
+                              activation=activation, padding=padding,
+                              kernel_regularizer=kernel_reg,
+                              dilation_rate=1,
+                              name=name + "_conv2")(bn)
         encoded = BatchNormalization(name=name + "_BN2")(conv)
 
         return encoded, residual_connections, filters
@@ -195,22 +231,25 @@ class UTime(Model):
                         dilation,  # NOT USED
                         padding,
                         kernel_reg=None,
+                        conv_dim=2,
                         name="upsample",
                         name_prefix=""):
         name = "{}{}".format(name_prefix, name)
+        layers = LAYERS[conv_dim]
+        kernel_size = time_axis(kernel_size, conv_dim)
         residual_connections = res_conns[::-1]
         for i in range(depth):
             filters = int(filters/2)
             l_name = name + "_L%i" % i
 
             # Up-sampling block
-            fs = pools[::-1][i]
-            up = UpSampling2D(size=(fs, 1),
+            fs = time_axis(pools[::-1][i], conv_dim)
+            up = layers["up"](size=fs,
                               name=l_name + "_up")(in_)
-            conv = Conv2D(filters, (fs, 1),
-                          activation=activation,
-                          padding=padding, kernel_regularizer=kernel_reg,
-                          name=l_name + "_conv1")(up)
+            conv = layers["conv"](filters, fs,
+                                  activation=activation,
+                                  padding=padding, kernel_regularizer=kernel_reg,
+                                  name=l_name + "_conv1")(up)
             bn = BatchNormalization(name=l_name + "_BN1")(conv)
 
             # Crop and concatenate
@@ -218,15 +257,15 @@ class UTime(Model):
             # cropped_res = residual_connections[i]
             merge = Concatenate(axis=-1,
                                 name=l_name + "_concat")([cropped_res, bn])
-            conv = Conv2D(filters, (kernel_size, 1),
-                          activation=activation, padding=padding,
-                          kernel_regularizer=kernel_reg,
-                          name=l_name + "_conv2")(merge)
+            conv = layers["conv"](filters, kernel_size,
+                                  activation=activation, padding=padding,
+                                  kernel_regularizer=kernel_reg,
+                                  name=l_name + "_conv2")(merge)
             bn = BatchNormalization(name=l_name + "_BN2")(conv)
-            conv = Conv2D(filters, (kernel_size, 1),
-                          activation=activation, padding=padding,
-                          kernel_regularizer=kernel_reg,
-                          name=l_name + "_conv3")(bn)
+            conv = layers["conv"](filters, kernel_size,
+                                  activation=activation, padding=padding,
+                                  kernel_regularizer=kernel_reg,
+                                  name=l_name + "_conv3")(bn)
             in_ = BatchNormalization(name=l_name + "_BN3")(conv)
         return in_
 
@@ -236,13 +275,15 @@ class UTime(Model):
                               filters,
                               dense_classifier_activation,
                               name_prefix=""):
-        cls = Conv2D(filters=filters,
-                     kernel_size=(1, 1),
-                     activation=dense_classifier_activation,
-                     name="{}dense_classifier_out".format(name_prefix))(in_)
+        layers = LAYERS[self.conv_dim]
+        cls = layers["conv"](filters=filters,
+                             kernel_size=time_axis(1, self.conv_dim),
+                             activation=dense_classifier_activation,
+                             name="{}dense_classifier_out".format(name_prefix))(in_)
         s = (self.n_periods * self.input_dims) - cls.get_shape().as_list()[1]
+        padding = time_axis([s // 2, s // 2 + s % 2], self.conv_dim)
         out = self.crop_nodes_to_match(
-            node1=ZeroPadding2D(padding=[[s // 2, s // 2 + s % 2], [0, 0]])(cls),
+            node1=layers["pad"](padding=padding)(cls),
             node2=in_reshaped
         )
         return out
@@ -254,19 +295,24 @@ class UTime(Model):
                             n_periods,
                             n_classes,
                             transition_window,
+                            conv_dim=2,
                             name_prefix=""):
-        cls = AveragePooling2D((data_per_period, 1),
-                               name="{}average_pool".format(name_prefix))(in_)
-        out = Conv2D(filters=n_classes,
-                     kernel_size=(transition_window, 1),
-                     activation="softmax",
-                     kernel_regularizer=regularizers.l2(1e-5),
-                     padding="same",
-                     name="{}sequence_conv_out".format(name_prefix))(cls)
+        layers = LAYERS[conv_dim]
+        cls = layers["avg_pool"](time_axis(data_per_period, conv_dim),
+                                 name="{}average_pool".format(name_prefix))(in_)
+        # Softmax output is kept in float32 under mixed precision policies
+        out = layers["conv"](filters=n_classes,
+                             kernel_size=time_axis(transition_window, conv_dim),
+                             activation="softmax",
+                             kernel_regularizer=regularizers.l2(1e-5),
+                             padding="same",
+                             dtype="float32",
+                             name="{}sequence_conv_out".format(name_prefix))(cls)
         s = [-1, n_periods, input_dims//data_per_period, n_classes]
         if s[2] == 1:
             s.pop(2)  # Squeeze the dim
         out = Lambda(lambda x: tf.reshape(x, s),
+                     dtype="float32",
                      name="{}sequence_classification_reshaped".format(name_prefix))(out)
         return out
 
@@ -279,6 +325,8 @@ class UTime(Model):
                                   self.input_dims,
                                   self.n_channels])
         reshaped = [-1, self.n_periods*self.input_dims, 1, self.n_channels]
+        if self.conv_dim == 1:
+            reshaped.pop(2)  # No 'dummy' axis
         in_reshaped = Lambda(lambda x: tf.reshape(x, reshaped))(inputs)
 
         # Apply regularization if not None or 0
@@ -293,6 +341,7 @@ class UTime(Model):
             "dilation": self.dilation,
             "padding": self.padding,
             "kernel_reg": kr,
+            "conv_dim": self.conv_dim,
             "name_prefix": name_prefix
         }
 
@@ -327,6 +376,7 @@ class UTime(Model):
                                            n_periods=self.n_periods,
                                            n_classes=self.n_classes,
                                            transition_window=self.transition_window,
+                                           conv_dim=self.conv_dim,
                                            name_prefix=name_prefix)
         else:
             out = cls
@@ -335,17 +385,19 @@ class UTime(Model):
 
     def crop_nodes_to_match(self, node1, node2):
         """
-        If necessary, applies Cropping2D layer to node1 to match shape of node2
+        If necessary, applies Cropping1D/2D layer to node1 to match shape of
+        node2
         """
-        s1 = np.array(node1.get_shape().as_list())[1:-2]
-        s2 = np.array(node2.get_shape().as_list())[1:-2]
+        s1 = np.array(node1.get_shape().as_list())[1:-self.conv_dim]
+        s2 = np.array(node2.get_shape().as_list())[1:-self.conv_dim]
 
         if np.any(s1 != s2):
             self.n_crops += 1
             c = (s1 - s2).astype(np.int)
             cr = np.array([c // 2, c // 2]).flatten()
             cr[self.n_crops % 2] += c % 2
-            cropped_node1 = Cropping2D([list(cr), [0, 0]])(node1)
+            crop = LAYERS[self.conv_dim]["crop"]
+            cropped_node1 = crop(time_axis(cr.tolist(), self.conv_dim))(node1)
         else:
             cropped_node1 = node1
         return cropped_node1
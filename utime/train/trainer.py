@@ -17,7 +17,7 @@ from mpunet.utils import ensure_list_or_tuple
 from mpunet.train.utils import (ensure_sparse, init_losses,
                                          init_metrics)
 from utime.callbacks import Validation
-from utime.train.utils import get_steps
+from utime.train.utils import get_steps, set_gradient_accumulation
 
 
 class Trainer(object):
@@ -33,6 +33,9 @@ class Trainer(object):
         model for training (passed as 'model' parameter here). For properly
         saving the model parameter, however, it is recommended to use the
         original, non-split model (here passed as 'org_model').
+        Models built under a tf.distribute Strategy scope (see
+        utime.utils.scriptutils.get_distribution_strategy) are not split, in
+        which case 'org_model' defaults to 'model'.
 
         Args:
             model:      (tf.keras Model) Initialized model to train
@@ -45,9 +48,10 @@ class Trainer(object):
 
         # Extra reference to original (non multiple-GPU) model
         # May also be set from a script at a later time (before self.fit call)
-        self.org_model = org_model
+        self.org_model = org_model if org_model is not None else model
 
-    def compile_model(self, optimizer, optimizer_kwargs, loss, metrics, **kwargs):
+    def compile_model(self, optimizer, optimizer_kwargs, loss, metrics,
+                      grad_accum_steps=1, steps_per_execution=1, **kwargs):
         """
         Compile the stored tf.keras Model instance stored in self.model
         Sets the loss function, optimizer and metrics
@@ -59,6 +63,10 @@ class Trainer(object):
                                        MultiPlanarUnet loss function
             metrics:          (list)   List of tf.keras.metrics or
                                        MultiPlanarUNet metrics.
+            grad_accum_steps: (int)    Number of batches to accumulate
+                                       gradients over before each update.
+            steps_per_execution: (int) Number of batches to run within each
+                                       call to the compiled train function.
             **kwargs:         (dict)   Key-word arguments passed to losses
                                        and/or metrics that accept such.
         """
@@ -76,10 +84,17 @@ class Trainer(object):
         metrics = init_metrics(metrics, self.logger, **kwargs)
 
         # Compile the model
-        self.model.compile(optimizer=optimizer, loss=losses, metrics=metrics)
+        compile_kwargs = {}
+        if steps_per_execution > 1:
+            compile_kwargs["experimental_steps_per_execution"] = steps_per_execution
+        self.model.compile(optimizer=optimizer, loss=losses, metrics=metrics,
+                           **compile_kwargs)
         self.logger("Optimizer:   %s" % optimizer)
         self.logger("Loss funcs:  %s" % losses)
         self.logger("Metrics:     %s" % init_metrics)
+        if grad_accum_steps > 1:
+            set_gradient_accumulation(self.model, grad_accum_steps)
+            self.logger("Grad accum.: %i steps" % grad_accum_steps)
         return self
 
     def fit(self, batch_size, **fit_kwargs):
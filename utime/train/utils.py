@@ -25,3 +25,98 @@ def get_steps(samples_per_epoch, sequence):
         return int(np.ceil(samples_per_epoch / sequence.batch_size))
     else:
         return len(sequence)
+
+
+def set_gradient_accumulation(model, accum_steps):
+    """
+    Modifies the compiled tf.keras Model 'model' in-place to accumulate
+    gradients over 'accum_steps' batches before each parameter update.
+
+    Gradients are summed in replica-local (ON_READ) variables. With a
+    tf.distribute.MirroredStrategy the gradient all-reduce is thus only run
+    once every 'accum_steps' batches instead of after each batch. The reduced
+    gradients are clipped according to the optimizer's clipnorm/clipvalue.
+
+    Two train functions are traced; one that only accumulates gradients and
+    one that also applies (and resets) them. The switch between the two is
+    made in Python for each batch, as the optimizer's cross-replica sync may
+    not be placed inside a tf.cond under a MirroredStrategy.
+
+    Must be called within the strategy scope that 'model' was built in and
+    after model.compile (which resets the model train function).
+
+    Args:
+        model:       (tf.keras Model) A compiled tf.keras Model
+        accum_steps: (int)            Number of batches to accumulate
+                                      gradients over for each update
+    """
+    import tensorflow as tf
+    from tensorflow.python.keras.engine import data_adapter
+    accum_grads = [
+        tf.Variable(tf.zeros_like(var),
+                    trainable=False,
+                    synchronization=tf.VariableSynchronization.ON_READ,
+                    aggregation=tf.VariableAggregation.SUM)
+        for var in model.trainable_variables
+    ]
+    # Mixed float16 policies wrap the optimizer in a LossScaleOptimizer
+    loss_scaled = isinstance(
+        model.optimizer, tf.keras.mixed_precision.experimental.LossScaleOptimizer
+    )
+    # Python state read when tracing model.train_step
+    state = {"apply": False, "step": 0}
+
+    def train_step(data):
+        data = data_adapter.expand_1d(data)
+        x, y, sample_weight = data_adapter.unpack_x_y_sample_weight(data)
+        with tf.GradientTape() as tape:
+            y_pred = model(x, training=True)
+            loss = model.compiled_loss(y, y_pred, sample_weight,
+                                       regularization_losses=model.losses)
+            if loss_scaled:
+                loss = model.optimizer.get_scaled_loss(loss)
+        grads = tape.gradient(loss, model.trainable_variables)
+        if loss_scaled:
+            grads = model.optimizer.get_unscaled_gradients(grads)
+        for accum_grad, grad in zip(accum_grads, grads):
+            accum_grad.assign_add(grad / accum_steps)
+        if state["apply"]:
+            # As in tf.keras Model.train_step; all-reduce, then clip
+            # (clipnorm/clipvalue) the gradients before applying them
+            optimizer = model.optimizer
+            grads = optimizer._aggregate_gradients(
+                zip([g.read_value() for g in accum_grads],
+                    model.trainable_variables)
+            )
+            grads = optimizer._clip_gradients(grads)
+            update = optimizer.apply_gradients(
+                zip(grads, model.trainable_variables),
+                experimental_aggregate_gradients=False
+            )
+            with tf.control_dependencies([update]):
+                for accum_grad in accum_grads:
+                    accum_grad.assign(tf.zeros_like(accum_grad))
+        model.compiled_metrics.update_state(y, y_pred, sample_weight)
+        return {m.name: m.result() for m in model.metrics}
+
+    def make_train_function():
+        if model.train_function is not None:
+            return model.train_function
+        train_functions = []
+        for _ in range(2):
+            model.train_function = None
+            train_functions.append(type(model).make_train_function(model))
+        accumulate_function, apply_function = train_functions
+
+        def train_function(iterator):
+            state["step"] += 1
+            state["apply"] = state["step"] % accum_steps == 0
+            if state["apply"]:
+                return apply_function(iterator)
+            return accumulate_function(iterator)
+        model.train_function = train_function
+        return train_function
+
+    model.train_step = train_step
+    model.make_train_function = make_train_function
+    return model
@@ -5,5 +5,5 @@ from .scriptutils import (assert_project_folder,
                           get_dataset_from_regex_pattern,
                           get_dataset_splits_from_hparams_file,
                           get_all_dataset_hparams,
-                          make_multi_gpu_model)
+                          get_distribution_strategy)
 from .extract import to_h5_file
@@ -262,28 +262,36 @@ def select_sample_strip_scale_quality(*datasets, hparams, logger=None):
         ))
 
 
-def make_multi_gpu_model(model, num_GPUs, logger=None):
+def get_distribution_strategy(num_GPUs, logger=None):
     """
-    Takes a compiled tf.keras Model object 'model' and applies
-    from tensorflow.keras.utils import multi_gpu_model
-    ... to mirror it across multiple visible GPUs. Input batches to 'model'
-    are split evenly across the GPUs.
+    Returns a tf.distribute Strategy object under which the model should be
+    built, compiled and fitted.
+
+    With num_GPUs > 1 a MirroredStrategy is returned, which replicates the
+    model on each visible GPU and synchronizes gradients with an NCCL
+    all-reduce after each step. This replaces the (deprecated)
+    tf.keras.utils.multi_gpu_model utility, which splits each batch on a
+    single master device and merges outputs back onto it.
+    Input batches are split evenly across the replicas, so 'batch_size' gives
+    the global batch size.
 
     Args:
-        model:    (tf.keras Model) A compiled tf.keras Model object.
-        num_GPUs: (int)            Number of GPUs to distribute the model over
-        logger:   (Logger)         Optional Logger object
+        num_GPUs: (int)    Number of GPUs to distribute the model over
+        logger:   (Logger) Optional Logger object
 
     Returns:
-        The split, multi-GPU model.
-        The original model
-        Note: The two will be the same for num_GPUs=1
+        A tf.distribute Strategy object
+        Note: The default (no-op) strategy is returned for num_GPUs <= 1
     """
-    org_model = model
+    import tensorflow as tf
     if num_GPUs > 1:
-        from tensorflow.keras.utils import multi_gpu_model
-        model = multi_gpu_model(org_model, gpus=num_GPUs,
-                                cpu_merge=False, cpu_relocation=False)
+        strategy = tf.distribute.MirroredStrategy(
+            cross_device_ops=tf.distribute.NcclAllReduce()
+        )
         logger = logger or ScreenLogger()
-        logger("Creating multi-GPU model: N=%i" % num_GPUs)
-    return model, org_model
+        logger("Creating MirroredStrategy: N={} replicas".format(
+            strategy.num_replicas_in_sync
+        ))
+    else:
+        strategy = tf.distribute.get_strategy()
+    return strategy
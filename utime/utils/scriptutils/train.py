@@ -100,8 +100,12 @@ def find_and_set_gpus(gpu_mon, force_GPU, num_GPUs):
     count the number of GPUs set and return this number.
     If not, use args.num_GPUs currently available GPUs and return args.num_GPUs
 
+    The GPUMonitor is stopped once the visibility is set. If 'gpu_mon' is None
+    free GPUs are not searched for; the forced GPUs or the first 'num_GPUs'
+    currently visible GPUs are used instead.
+
     Args:
-        gpu_mon:   (GPUMonitor) Initialized GPUMonitor
+        gpu_mon:   (GPUMonitor) Initialized GPUMonitor or None
         force_GPU: (string)     A CUDA_VISIBLE_DEVICES type string to be set
         num_GPUs:  (int)        Number of free/available GPUs to automatically
                                 select using 'gpu_mon' when 'force_GPU' is not
@@ -110,10 +114,25 @@ def find_and_set_gpus(gpu_mon, force_GPU, num_GPUs):
     Returns:
         (int) The actual number of GPUs now visible
     """
+    if gpu_mon is None:
+        if force_GPU:
+            from mpunet.utils.system import set_gpu
+            set_gpu(force_GPU)
+        import tensorflow as tf
+        gpus = tf.config.list_physical_devices("GPU")
+        if not force_GPU:
+            if len(gpus) < num_GPUs:
+                raise RuntimeError("Requested {} GPUs, but only {} are "
+                                   "visible.".format(num_GPUs, len(gpus)))
+            # Must be set before the GPUs are initialized by TensorFlow
+            gpus = gpus[:num_GPUs]
+            tf.config.set_visible_devices(gpus, "GPU")
+        return len(gpus)
     if not force_GPU:
         gpu_mon.await_and_set_free_GPU(N=num_GPUs, stop_after=True)
     else:
         gpu_mon.set_GPUs = force_GPU
+        gpu_mon.stop()
     return gpu_mon.num_currently_visible
 
 
@@ -204,3 +223,51 @@ def save_final_weights(project_dir, model, file_name, logger=None):
     if os.path.exists(model_path):
         os.remove(model_path)
     model.save_weights(model_path)
+
+
+def save_int8_model(project_dir, model, calibration_seqs, file_name,
+                    n_calibration_batches=100, logger=None):
+    """
+    Converts 'model' to a post-training int8 quantized TFLite model and saves
+    it to path project_dir/model/'file_name' (with extension .tflite).
+
+    Activation ranges are calibrated on 'n_calibration_batches' batches drawn
+    from the Sequence objects in 'calibration_seqs' (in turn). Ops without
+    int8 support are kept in float32, as are the model inputs and outputs.
+
+    Args:
+        project_dir:           (string)         Path to the project directory
+        model:                 (tf.keras Model) The model to quantize
+        calibration_seqs:      (list)           List of Sequence objects to
+                                                sample calibration data from
+        file_name:             (string)         Name of the saved model file
+        n_calibration_batches: (int)            Number of calibration batches
+        logger:                (Logger)         Optional Logger instance
+    """
+    import os
+    import numpy as np
+    import tensorflow as tf
+
+    def representative_dataset():
+        for i in range(n_calibration_batches):
+            seq = calibration_seqs[i % len(calibration_seqs)]
+            X, _ = seq[i]
+            for x in X:
+                # Calibrate sample-wise, converted model has batch size 1
+                yield [np.expand_dims(x, 0).astype(np.float32)]
+
+    logger = logger or ScreenLogger()
+    logger("Quantizing model to int8 using {} calibration "
+           "batches".format(n_calibration_batches))
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    tflite_model = converter.convert()
+
+    if not os.path.exists("%s/model" % project_dir):
+        os.mkdir("%s/model" % project_dir)
+    model_path = "{}/model/{}.tflite".format(project_dir,
+                                             os.path.splitext(file_name)[0])
+    logger("Saving int8 model to: %s" % model_path)
+    with open(model_path, "wb") as out_f:
+        out_f.write(tflite_model)